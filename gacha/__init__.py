@@ -1,2 +1,2 @@
-from gacha.simulator import GachaSimulator
+from gacha.simulator import GachaSimulator, ExperimentMode
 from gacha.common_games import Games
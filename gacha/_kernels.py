@@ -0,0 +1,169 @@
+from typing import Callable, Tuple
+
+import numpy as np
+
+
+def build_alias_table(
+        probs: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Build a Walker/Vose alias table for a finite distribution.
+
+    Sampling from the table is O(1): scale a uniform by the table size,
+    split it into an index `k` and a fraction `f`, and take `k` itself
+    when `f < prob[k]`, otherwise its alias.
+
+    Parameters
+    ----------
+    probs : np.ndarray
+        The probabilities of the outcomes; normalized internally.
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray]
+        The acceptance-probability and alias-index arrays, both of the
+        distribution's length.
+    """
+    p = np.asarray(probs, dtype=np.float64)
+    n = len(p)
+    scaled = (p * n / p.sum()).tolist()
+
+    prob = np.ones(n, dtype=np.float64)
+    alias = np.arange(n, dtype=np.int64)
+    small = [i for i, s in enumerate(scaled) if s < 1.0]
+    large = [i for i, s in enumerate(scaled) if s >= 1.0]
+    while small and large:
+        s = small.pop()
+        l = large.pop()
+        prob[s] = scaled[s]
+        alias[s] = l
+        scaled[l] -= 1.0 - scaled[s]
+        (small if scaled[l] < 1.0 else large).append(l)
+    # leftovers are 1 up to rounding; the defaults already cover them
+
+    return prob, alias
+
+
+def sample_ssr_events(
+        wait_cum: np.ndarray,
+        sub_cums: np.ndarray,
+        next_table: np.ndarray,
+        alias_prob: np.ndarray,
+        alias_idx: np.ndarray,
+        table_id: int,
+        cur_cnt: int,
+        n_attempts: int,
+        rand: Callable[[int], np.ndarray]
+) -> Tuple[np.ndarray, np.ndarray, int, int]:
+    """
+    Sample the SSR events of a block of gacha attempts, skipping the
+    `no_ssr` draws en masse.
+
+    Instead of drawing every attempt, the number of attempts until the
+    next SSR is sampled in one shot from the waiting-time CDF
+    (`wait_cum`), and only then is the concrete SSR item resolved from
+    the conditional sub-outcome CDF of the active pool. The cost is two
+    uniforms per SSR event rather than one per attempt.
+
+    Parameters
+    ----------
+    wait_cum : np.ndarray
+        CDF of the attempt on which an SSR fires, starting from pity 0.
+        Identical for both pools, since major pity only redistributes
+        probability among the SSR items.
+    sub_cums : np.ndarray
+        Stacked `(2, n_ssr_items)` CDFs over the SSR items, conditioned
+        on an SSR firing; index 0 is the regular pool and index 1 the
+        major-pity pool. The conditioning cancels the per-row
+        probability, so one row per pool covers every pity count.
+    next_table : np.ndarray
+        Lookup from outcome code to the pool the next draw uses, folding
+        the major-pity trigger into a branchless indexed load.
+    alias_prob, alias_idx : np.ndarray
+        Alias table over the waiting-time distribution from pity 0 (see
+        `build_alias_table`), used for the O(1) draw after each SSR; only
+        a draw conditioned on a nonzero pity falls back to inverting
+        `wait_cum`.
+    table_id : int
+        The active pool: 0 for regular, 1 for major pity.
+    cur_cnt : int
+        The pity counter at the start of the block.
+    n_attempts : int
+        Number of attempts in the block.
+    rand : Callable
+        Source of uniform samples, e.g. `np.random.default_rng().random`;
+        called with a size to refill the internal buffer in bulk.
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray, int, int]
+        The `n_gacha` and outcome-code arrays of the SSR events, plus the
+        pity counter and active pool at the end of the block.
+    """
+    searchsorted = np.searchsorted
+    max_row = len(wait_cum) - 1
+    max_sub = sub_cums.shape[1] - 1
+    n_rows = max_row + 1
+    # hoist the two-outcome thresholds so the common pools never touch
+    # the array inside the loop
+    first_cut = (float(sub_cums[0, 0]), float(sub_cums[1, 0]))
+    # plain lists index faster than ndarrays from the Python loop
+    a_prob = alias_prob.tolist()
+    a_idx = alias_idx.tolist()
+
+    # preallocated result buffers; `n_events` tracks the filled length
+    out_cnt = np.empty(n_attempts, dtype=np.int64)
+    out_code = np.empty(n_attempts, dtype=np.int64)
+    n_events = 0
+
+    # rolling buffer of pre-drawn uniforms: one bulk rng call amortizes
+    # across many events instead of a generator call per sample
+    buf_size = 256
+    u_buf = rand(buf_size).tolist()
+    ui = 0
+
+    remaining = n_attempts
+    while remaining > 0:
+        if ui >= buf_size - 1:
+            u_buf = rand(buf_size).tolist()
+            ui = 0
+
+        if cur_cnt:
+            # conditioned on having survived to `cur_cnt`, invert the waiting CDF
+            lo = wait_cum[cur_cnt - 1]
+            j = min(searchsorted(wait_cum, lo + u_buf[ui] * (1.0 - lo), side='right'), max_row)
+        else:
+            # fresh pity: one O(1) alias lookup instead of a binary search
+            u = u_buf[ui] * n_rows
+            k = int(u)
+            j = k if u - k < a_prob[k] else a_idx[k]
+        ui += 1
+
+        used = j - cur_cnt + 1
+        if used > remaining:
+            # no SSR within the block; surviving the leftover attempts is
+            # exactly the condition the next block resumes from
+            cur_cnt += remaining
+            break
+        remaining -= used
+
+        # resolve which SSR item fired; the common one- and two-outcome
+        # pools resolve with at most a single compare instead of a search
+        if max_sub == 0:
+            code = 1
+        elif max_sub == 1:
+            code = 1 if u_buf[ui] < first_cut[table_id] else 2
+            ui += 1
+        else:
+            code = 1 + min(searchsorted(sub_cums[table_id], u_buf[ui], side='right'), max_sub)
+            ui += 1
+
+        # trigger major pity system
+        table_id = next_table[code]
+
+        out_cnt[n_events] = j + 1
+        out_code[n_events] = code
+        n_events += 1
+        cur_cnt = 0
+
+    return out_cnt[:n_events], out_code[:n_events], cur_cnt, table_id
@@ -1,4 +1,5 @@
 from enum import Enum
+from types import MappingProxyType
 
 
 class Games(Enum):
@@ -14,13 +15,18 @@ class Games(Enum):
     def gacha_data(
             self
     ):
-        return _g_sys(self.value)
+        return _GAMES[self.value]
 
 
-def _g_sys(
-        game_id
-):
-    common = {
+# built once at import time; read-only so `gacha_data` is a plain O(1) lookup.
+# list values are frozen to tuples so the shared table cannot be mutated
+# through them either
+_GAMES = MappingProxyType({
+    game_id: MappingProxyType({
+        key: tuple(value) if isinstance(value, list) else value
+        for key, value in cfg.items()
+    })
+    for game_id, cfg in {
         1: {
             'base_prob': 0.016,
             'base_cnt': 60,
@@ -98,6 +104,5 @@ def _g_sys(
             'major_pity_list': ['A'],
             'name': 'Love and Deepspace'
         }
-    }
-
-    return common.get(game_id)
+    }.items()
+})
@@ -1,15 +1,24 @@
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Optional, Tuple
 
 
-@dataclass
+@dataclass(frozen=True)
 class GachaMeta:
     base_prob: float
     base_cnt: int
     up_percent: float
-    up_list: Optional[List]
+    up_list: Optional[Tuple]
     prob_increase: Optional[float]
     pity_cnt: int
     official_prob: Optional[float]
-    major_pity_list: Optional[List]
+    major_pity_list: Optional[Tuple]
     name: str
+
+    def __post_init__(
+            self
+    ):
+        # freeze the list fields too, so instances are fully immutable and hashable
+        if self.up_list is not None:
+            object.__setattr__(self, 'up_list', tuple(self.up_list))
+        if self.major_pity_list is not None:
+            object.__setattr__(self, 'major_pity_list', tuple(self.major_pity_list))
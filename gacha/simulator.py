@@ -1,16 +1,184 @@
+import os
+import sys
 from typing import Union, Dict, List, Generator, Optional, Tuple, Any
-from random import choices
-from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from copy import deepcopy
+from enum import Enum
+from functools import cache, cached_property, partial
 
+import numpy as np
 import pandas as pd
+from tqdm import tqdm
 
 from gacha.meta import GachaMeta
-from gacha.utils import counter_contain, cal_individual_probs, cal_conditional_probs, cal_expectation, \
+from gacha._kernels import build_alias_table, sample_ssr_events
+from gacha.utils import cal_individual_probs, cal_conditional_probs, cal_expectation, \
     estimate_prob_increase
 from gacha.exceptions import SystemBuildError
 
 
+class ExperimentMode(Enum):
+    SSR_CNT = 0
+    SAMPLE_MEAN = 1
+    EMPIRICAL_PROB = 2
+
+
+def _reduce_ssr_cnt(
+        counts: np.ndarray,
+        single_experiment: int
+) -> List[float]:
+    return counts.tolist()
+
+
+def _reduce_sample_mean(
+        counts: np.ndarray,
+        single_experiment: int
+) -> List[float]:
+    # rounds without any SSR yield inf, matching 'attempts per SSR'
+    with np.errstate(divide='ignore'):
+        return (single_experiment / counts).tolist()
+
+
+def _reduce_empirical_prob(
+        counts: np.ndarray,
+        single_experiment: int
+) -> List[float]:
+    return (counts / single_experiment).tolist()
+
+
+# one vectorized reducer per ExperimentMode value, resolved once per run
+_MODE_REDUCERS = {
+    ExperimentMode.SSR_CNT.value: _reduce_ssr_cnt,
+    ExperimentMode.SAMPLE_MEAN.value: _reduce_sample_mean,
+    ExperimentMode.EMPIRICAL_PROB.value: _reduce_empirical_prob
+}
+
+
+def _experiment_chunk(
+        args
+):
+    """
+    Picklable worker for the parallel path of `multi_experiments`:
+    run one shard of the rounds in a separate process.
+    """
+    simulator, single_experiment, mode_code, start, major_pity_start, n_rounds, seed = args
+    # every worker receives the same pickled generator state; reseed so
+    # the shards are statistically independent
+    simulator._rng = np.random.default_rng(seed)
+
+    return simulator._experiment_rounds(single_experiment, mode_code, start, major_pity_start, n_rounds)
+
+
+def _attempts_chunk(
+        args
+):
+    """
+    Picklable worker for the parallel path of `simulate_by_attempts`:
+    run one shard of the rounds in a separate process.
+    """
+    simulator, n_attempts, targets_arr, start, major_pity_start, n_rounds, seed = args
+    simulator._rng = np.random.default_rng(seed)
+
+    return [
+        simulator._attempt_round(n_attempts, targets_arr, start, major_pity_start)
+        for _ in range(n_rounds)
+    ]
+
+
+@cache
+def _sampling_tables(
+        key: Tuple
+) -> Tuple:
+    """
+    Build the struct-of-arrays sampling state for one gacha
+    configuration: the outcome pool with its code index, the
+    waiting-time CDF with its alias table, the stacked per-pool
+    sub-outcome CDFs and the pool-transition lookup.
+
+    Memoized on the numeric configuration (everything in `GachaMeta`
+    except the display fields), so parameter sweeps that rebuild the
+    same system share one read-only set of tables.
+    """
+    base_prob, base_cnt, pity_cnt, prob_increase, up_percent, up_list, major_pity_list = key
+    n_up = len(up_list)
+
+    individual_probs = cal_individual_probs(
+        base_prob=base_prob,
+        base_cnt=base_cnt,
+        pity_cnt=pity_cnt,
+        prob_increase=prob_increase
+    )
+    conditional_probs = cal_conditional_probs(individual_probs)
+
+    # interned labels make the per-event dict lookups and equality
+    # checks on yielded items a pointer compare in the common case
+    pool = tuple(
+        sys.intern(item) if isinstance(item, str) else item
+        for item in ('no_ssr', 'other_ssr') + tuple(up_list)
+    )
+    code_index = {item: code for code, item in enumerate(pool)}
+
+    # waiting-time CDF over attempts plus, per pool, the sub-outcome CDF
+    # conditioned on an SSR firing -- see `sample_ssr_events`. Both are
+    # independent of the pity row: conditioning on an SSR cancels the
+    # per-row probability, so one CDF row per pool replaces the former
+    # (pity_cnt, n_items) table and the per-event row load with it.
+    # accumulate in float64, then store as float32: the CDFs are only
+    # compared against uniforms, so the ~1e-7 rounding is far below
+    # Monte Carlo noise and the row loads move half the bytes
+    wait_cum = np.minimum(np.cumsum(conditional_probs), 1.0)
+    wait_cum[-1] = 1.0
+    wait_cum = wait_cum.astype(np.float32)
+    sub_weights = np.empty((2, 1 + n_up), dtype=np.float64)
+    sub_weights[0, 0] = 1 - up_percent
+    sub_weights[0, 1:] = up_percent / n_up
+    if major_pity_list:
+        sub_weights[1, 0] = 0
+        sub_weights[1, 1:] = [
+            1 / len(major_pity_list) if item in major_pity_list else 0
+            for item in up_list
+        ]
+    else:
+        sub_weights[1] = sub_weights[0]
+    sub_cums = np.cumsum(sub_weights, axis=1)
+    sub_cums[:, -1] = 1.0
+    sub_cums = sub_cums.astype(np.float32)
+    # which pool the draw after each outcome uses: items in the major
+    # pity cycle reset to the regular pool, everything else arms it
+    next_table = np.array([
+        0 if major_pity_list and item in major_pity_list else 1
+        for item in pool
+    ], dtype=np.int64)
+
+    # O(1) alias sampler for the waiting time from a fresh pity, the
+    # common draw after every SSR event
+    alias_prob, alias_idx = build_alias_table(conditional_probs)
+
+    for arr in (wait_cum, sub_cums, next_table, alias_prob, alias_idx):
+        arr.setflags(write=False)
+
+    return pool, code_index, wait_cum, sub_cums, next_table, alias_prob, alias_idx
+
+
+@cache
+def _estimate_increase(
+        base_prob: float,
+        base_cnt: int,
+        pity_cnt: int,
+        target_prob: float
+) -> float:
+    """
+    Memoized front of `estimate_prob_increase`: parameter sweeps rebuild
+    the same systems many times, and only the scalar estimate is needed.
+    """
+    return float(estimate_prob_increase(
+        base_prob=base_prob,
+        base_cnt=base_cnt,
+        pity_cnt=pity_cnt,
+        target_prob=target_prob
+    ).x)
+
+
 class GachaSimulator:
     def __init__(
             self,
@@ -22,7 +190,8 @@ class GachaSimulator:
             pity_cnt: Optional[int] = None,
             official_prob: Optional[float] = None,
             major_pity_list: Optional[List] = None,
-            name: str = 'unknown game'
+            name: str = 'unknown game',
+            seed: Optional[int] = None
     ):
         """
         A simulator for a specific gacha system.
@@ -48,14 +217,17 @@ class GachaSimulator:
             `None` indicates no major pity mechanism, meaning all SSR characters are equally likely to be drawn.
         name : Optional[str], default 'unknown game'
             The name of your mobile game.
+        seed : Optional[int], default `None`
+            Seed for the simulator's random generator. `None` draws fresh
+            OS entropy; pass an int for reproducible simulations.
         """
         if prob_increase is None and official_prob is not None:
-            prob_increase = estimate_prob_increase(
+            prob_increase = _estimate_increase(
                 base_prob=base_prob,
                 base_cnt=base_cnt,
                 pity_cnt=pity_cnt,
                 target_prob=official_prob
-            ).x[0]
+            )
 
         # store meta data
         self.meta = GachaMeta(
@@ -86,33 +258,14 @@ class GachaSimulator:
         self.expectation = cal_expectation(conditional_probs)
         self.theoretical_prob = 1 / self.expectation
 
-        # detailed probabilities
-        n_up = len(up_list)
-        regular_probs = []
-        for indi_p, condi_p in zip(individual_probs, conditional_probs):
-            cur_up = indi_p * up_percent
-            regular_probs.append(
-                {
-                    "no_ssr": 1 - indi_p,
-                    "other_ssr": indi_p - cur_up,
-                    **{x: cur_up / n_up for x in up_list},
-                    "total_ssr": indi_p,
-                    "ssr_n_gacha": condi_p
-                }
-            )
-        self.regular_probs = regular_probs
+        # kept for the lazily built presentational tables
+        self._individual_probs = individual_probs
+        self._conditional_probs = conditional_probs
 
-        major_pity_probs = deepcopy(regular_probs)
-        if major_pity_list:
-            n_up = len(major_pity_list)
-            for x in major_pity_probs:
-                x["other_ssr"] = 0
-                indi_p = x["total_ssr"]
-                single_ssr_p = indi_p / n_up
-                for item in up_list:
-                    x[item] = 0 if item not in major_pity_list else single_ssr_p
+        self._build_tables()
 
-        self.major_pity_probs = major_pity_probs
+        # one PCG64 generator per simulator; seedable for reproducibility
+        self._rng = np.random.default_rng(seed)
 
     def __repr__(
             self
@@ -124,6 +277,45 @@ class GachaSimulator:
     ):
         return f"The {self.__class__.__name__} for {self.meta.name}"
 
+    def _build_tables(
+            self
+    ):
+        """
+        Attach the struct-of-arrays sampling state the hot paths run on
+        and bind the kernel to it. The tables themselves come from the
+        memoized module-level builder and may be shared with other
+        simulators of the same configuration.
+        """
+        meta = self.meta
+        (
+            self._pool,
+            self._code_index,
+            self._wait_cum,
+            self._sub_cums,
+            self._next_table,
+            self._alias_prob,
+            self._alias_idx
+        ) = _sampling_tables((
+            meta.base_prob,
+            meta.base_cnt,
+            meta.pity_cnt,
+            meta.prob_increase,
+            meta.up_percent,
+            meta.up_list,
+            meta.major_pity_list
+        ))
+
+        # bind the constant tables into the kernel once, so the hot loops
+        # pass only the per-call state
+        self._sample_block = partial(
+            sample_ssr_events,
+            self._wait_cum,
+            self._sub_cums,
+            self._next_table,
+            self._alias_prob,
+            self._alias_idx
+        )
+
     def _check(
             self
     ):
@@ -145,7 +337,65 @@ class GachaSimulator:
         if meta.base_cnt > meta.pity_cnt:
             raise SystemBuildError("`base_cnt` greater than `pity_cnt`")
 
-    @property
+    @cached_property
+    def regular_probs(
+            self
+    ):
+        """
+        Detailed per-attempt probabilities of the regular pool, as a list
+        of dicts. Presentational only; the samplers never read it.
+        """
+        meta = self.meta
+        n_up = len(meta.up_list)
+        regular_probs = []
+        for indi_p, condi_p in zip(self._individual_probs, self._conditional_probs):
+            cur_up = indi_p * meta.up_percent
+            regular_probs.append(
+                {
+                    "no_ssr": 1 - indi_p,
+                    "other_ssr": indi_p - cur_up,
+                    **{x: cur_up / n_up for x in meta.up_list},
+                    "total_ssr": indi_p,
+                    "ssr_n_gacha": condi_p
+                }
+            )
+
+        return regular_probs
+
+    @cached_property
+    def major_pity_probs(
+            self
+    ):
+        """
+        Detailed per-attempt probabilities of the major-pity pool, as a
+        list of dicts. Presentational only; the samplers never read it.
+        """
+        meta = self.meta
+        if not meta.major_pity_list:
+            return deepcopy(self.regular_probs)
+
+        # built directly instead of deep-copying the regular table and
+        # rewriting most of its columns
+        n_up = len(meta.major_pity_list)
+        major_pity_probs = []
+        for indi_p, condi_p in zip(self._individual_probs, self._conditional_probs):
+            single_ssr_p = indi_p / n_up
+            major_pity_probs.append(
+                {
+                    "no_ssr": 1 - indi_p,
+                    "other_ssr": 0,
+                    **{
+                        x: single_ssr_p if x in meta.major_pity_list else 0
+                        for x in meta.up_list
+                    },
+                    "total_ssr": indi_p,
+                    "ssr_n_gacha": condi_p
+                }
+            )
+
+        return major_pity_probs
+
+    @cached_property
     def regular_table(
             self
     ):
@@ -154,7 +404,7 @@ class GachaSimulator:
 
         return df
 
-    @property
+    @cached_property
     def major_pity_table(
             self
     ):
@@ -169,41 +419,193 @@ class GachaSimulator:
             start: int,
             major_pity_start: bool
     ) -> Generator[Tuple[int, Any], None, None]:
-        major_pity_list = self.meta.major_pity_list
-
-        if major_pity_start:
-            values = self.major_pity_probs
-        else:
-            values = self.regular_probs
+        pool = self._pool
+        rand = self._rng.random
+        kernel = self._sample_block
+        block_size = 4096
+        table_id = 1 if major_pity_start else 0
 
         cur_cnt = start
-        for _ in range(n_attempts):
-            # attempt once
-            cur_value = values[cur_cnt]
-            result = choices(list(cur_value.keys())[:-2], list(cur_value.values())[:-2])[0]
-            cur_cnt += 1
-
-            # do not record normal items
-            if result == 'no_ssr':
+        remaining = n_attempts
+        while remaining > 0:
+            n = min(block_size, remaining)
+            cnts, codes, cur_cnt, table_id = kernel(table_id, cur_cnt, n, rand)
+            for cnt, code in zip(cnts.tolist(), codes.tolist()):
+                yield cnt, pool[code]
+            remaining -= n
+
+    @staticmethod
+    def _is_reach_target(
+            counts,
+            targets_arr
+    ):
+        # single target is the common case; skip the matrix reduction for it
+        if len(targets_arr) == 1:
+            return bool((counts >= targets_arr[0]).all())
+
+        return bool((counts >= targets_arr).all(axis=1).any())
+
+    def _encode_targets(
+            self,
+            targets: Union[Dict, List[Dict]]
+    ) -> np.ndarray:
+        """
+        Translate target dicts into an integer matrix over outcome codes,
+        one row per optional target. Targets asking for items the pool can
+        never yield are dropped, as they can never be achieved.
+        """
+        if isinstance(targets, Dict):
+            targets = [targets]
+
+        code_index = self._code_index
+        rows = []
+        for t in targets:
+            if any(item not in code_index for item in t):
                 continue
+            row = np.zeros(len(self._pool), dtype=np.int64)
+            for item, quantity in t.items():
+                row[code_index[item]] = quantity
+            rows.append(row)
 
-            # trigger major pity system
-            if major_pity_list and result in major_pity_list:
-                values = self.regular_probs
-            else:
-                values = self.major_pity_probs
+        return np.array(rows, dtype=np.int64).reshape(len(rows), len(self._pool))
 
-            yield cur_cnt, result
+    def _attempt_round(
+            self,
+            n_attempts: int,
+            targets_arr: np.ndarray,
+            start: int,
+            major_pity_start: bool
+    ) -> bool:
+        rand = self._rng.random
+        kernel = self._sample_block
 
-            # refresh
-            cur_cnt = 0
+        n_items = len(self._pool)
+        counts = np.zeros(n_items, dtype=np.int64)
+        cur_cnt = start
+        table_id = 1 if major_pity_start else 0
+        remaining = n_attempts
+        while remaining > 0:
+            n = min(4096, remaining)
+            _, codes, cur_cnt, table_id = kernel(table_id, cur_cnt, n, rand)
+            # histogram the integer event codes straight off the kernel
+            counts += np.bincount(codes, minlength=n_items)
+            remaining -= n
+
+        return self._is_reach_target(counts, targets_arr)
+
+    def multi_experiments(
+            self,
+            single_experiment: int,
+            mode: ExperimentMode = ExperimentMode.SSR_CNT,
+            start: int = 0,
+            major_pity_start: bool = False,
+            total_round: int = 10000,
+            n_jobs: Optional[int] = None
+    ) -> List[float]:
+        """
+        Repeat experiments of a fixed number of gacha attempts and summarize
+        each round according to `mode`.
 
-    @staticmethod
-    def _is_reach_target(
-            records,
-            target_list
-    ):
-        return any([counter_contain(records, t) for t in target_list])
+        Parameters
+        ----------
+        single_experiment : int
+            Number of gacha attempts per round.
+        mode : ExperimentMode
+            `SSR_CNT` records the number of SSR items per round,
+            `SAMPLE_MEAN` the average attempts per SSR item,
+            and `EMPIRICAL_PROB` the observed SSR probability.
+        start : int
+            The starting point of the attempt, indicating at which draw it is located in the current item pool.
+        major_pity_start: bool, default `False`
+            Indicates whether the major pity is approaching.
+        total_round : int
+            The total number of simulation rounds.
+        n_jobs : Optional[int]
+            Number of worker processes to shard the rounds across.
+            `None` or 1 runs in-process; -1 uses all CPUs. Rounds are
+            independent, so the speedup is roughly linear in cores.
+
+        Returns
+        -------
+        List[float]
+            One summary value per round.
+        """
+        # resolve the mode to a plain int once, outside the round loop
+        mode_code = mode.value
+
+        if n_jobs is not None and n_jobs != 1:
+            max_workers = os.cpu_count() if n_jobs == -1 else n_jobs
+            # small workloads are not worth the process start-up cost
+            if total_round >= 4 * max_workers:
+                base, extra = divmod(total_round, max_workers)
+                seeds = self._rng.integers(np.iinfo(np.int64).max, size=max_workers)
+                shards = [
+                    (self, single_experiment, mode_code, start, major_pity_start, base + (i < extra), int(seeds[i]))
+                    for i in range(max_workers)
+                ]
+                results = []
+                # one progress tick per finished shard, not per round
+                with ProcessPoolExecutor(max_workers=max_workers) as executor, \
+                        tqdm(total=total_round) as pbar:
+                    for part in executor.map(_experiment_chunk, shards):
+                        results.extend(part)
+                        pbar.update(len(part))
+
+                return results
+
+        return self._experiment_rounds(single_experiment, mode_code, start, major_pity_start, total_round)
+
+    def _batch_ssr_counts(
+            self,
+            single_experiment: int,
+            start: int,
+            n_rounds: int
+    ) -> np.ndarray:
+        """
+        Sample the SSR count of every round in one vectorized sweep.
+
+        The waiting time between SSR events does not depend on the active
+        pool (major pity only redistributes probability among items), so
+        counting SSR events needs no per-event bookkeeping: draw waiting
+        times for all still-running rounds at once and stop the rounds
+        whose attempts are spent.
+        """
+        wait_cum = self._wait_cum
+        max_row = len(wait_cum) - 1
+        rng = self._rng
+
+        # first waiting time per round, conditioned on the starting pity
+        lo = wait_cum[start - 1] if start else 0.0
+        first = np.minimum(
+            np.searchsorted(wait_cum, lo + rng.random(n_rounds) * (1.0 - lo), side='right'),
+            max_row
+        )
+        spent = first + 1 - start
+
+        counts = np.zeros(n_rounds, dtype=np.int64)
+        alive = spent <= single_experiment
+        while alive.any():
+            counts[alive] += 1
+            waits = np.minimum(
+                np.searchsorted(wait_cum, rng.random(int(alive.sum())), side='right'),
+                max_row
+            ) + 1
+            spent[alive] += waits
+            alive &= spent <= single_experiment
+
+        return counts
+
+    def _experiment_rounds(
+            self,
+            single_experiment: int,
+            mode_code: int,
+            start: int,
+            major_pity_start: bool,
+            n_rounds: int
+    ) -> List[float]:
+        counts = self._batch_ssr_counts(single_experiment, start, n_rounds)
+
+        return _MODE_REDUCERS[mode_code](counts, single_experiment)
 
     def simulate_by_attempts(
             self,
@@ -211,7 +613,8 @@ class GachaSimulator:
             targets: Union[Dict, List[Dict]],
             start: int = 0,
             major_pity_start: bool = False,
-            total_round: int = 10000
+            total_round: int = 10000,
+            n_jobs: Optional[int] = None
     ) -> Generator[bool, None, None]:
         """
         Perform multiple simulations with given number of gacha attempts and SSR targets,
@@ -232,6 +635,9 @@ class GachaSimulator:
             Indicates whether the major pity is approaching.
         total_round : int
             The total number of simulation rounds.
+        n_jobs : Optional[int]
+            Number of worker processes to shard the rounds across.
+            `None` or 1 runs in-process; -1 uses all CPUs.
 
         Returns
         -------
@@ -239,21 +645,28 @@ class GachaSimulator:
             Generator yielding results. Each result is `True` or `False`,
             representing whether the targets are achieved or not.
         """
-        if isinstance(targets, Dict):
-            targets = [targets]
-        targets = [Counter(x) for x in targets]
-
-        for _ in range(total_round):
-            rec = list(
-                self.multi_attempts(
-                    n_attempts=n_attempts,
-                    start=start,
-                    major_pity_start=major_pity_start
-                )
-            )
-            rec_cnt = Counter([x[1] for x in rec])
-
-            yield self._is_reach_target(rec_cnt, targets)
+        targets_arr = self._encode_targets(targets)
+
+        if n_jobs is not None and n_jobs != 1:
+            max_workers = os.cpu_count() if n_jobs == -1 else n_jobs
+            if total_round >= 4 * max_workers:
+                base, extra = divmod(total_round, max_workers)
+                seeds = self._rng.integers(np.iinfo(np.int64).max, size=max_workers)
+                shards = [
+                    (self, n_attempts, targets_arr, start, major_pity_start, base + (i < extra), int(seeds[i]))
+                    for i in range(max_workers)
+                ]
+                # one progress tick per finished shard, not per round
+                with ProcessPoolExecutor(max_workers=max_workers) as executor, \
+                        tqdm(total=total_round) as pbar:
+                    for part in executor.map(_attempts_chunk, shards):
+                        yield from part
+                        pbar.update(len(part))
+
+                return
+
+        for _ in tqdm(range(total_round), miniters=max(1, total_round // 100), mininterval=0.2, smoothing=0):
+            yield self._attempt_round(n_attempts, targets_arr, start, major_pity_start)
 
     def simulate_by_targets(
             self,
@@ -284,22 +697,56 @@ class GachaSimulator:
         int
             The number of gacha attempts needed to achieve the targets for each simulation round.
         """
-        if isinstance(targets, Dict):
-            targets = [targets]
-        targets = [Counter(x) for x in targets]
-
-        for _ in range(total_round):
-            cur_cnt = Counter()
-            ssr_rec = self.multi_attempts(
-                10 ** 8,
-                start=start,
-                major_pity_start=major_pity_start
-            )
+        targets_arr = self._encode_targets(targets)
+
+        is_reach_target = self._is_reach_target
+
+        rand = self._rng.random
+        kernel = self._sample_block
+        # most rounds finish within a few waiting times, so start each
+        # round with a small block and double on miss instead of always
+        # sampling far past the target
+        first_block = max(256, 4 * int(self.expectation))
+        block_cap = 8192
+        # safety cap per round, in case the targets can never be achieved
+        max_attempts = 10 ** 8
+
+        # with a single target the reach check collapses to an integer
+        # countdown: decrement what is still owed and stop at zero
+        single_target = targets_arr[0].tolist() if len(targets_arr) == 1 else None
+
+        for _ in tqdm(range(total_round), miniters=max(1, total_round // 100), mininterval=0.2, smoothing=0):
+            if single_target is not None:
+                remaining = single_target.copy()
+                rem_total = sum(remaining)
+            else:
+                counts = np.zeros(len(self._pool), dtype=np.int64)
+            cur_cnt = start
+            table_id = 1 if major_pity_start else 0
             i = -start
-            for n_attempts, ssr_item in ssr_rec:
-                i += n_attempts
-                cur_cnt[ssr_item] += 1
-                if self._is_reach_target(cur_cnt, targets):
-                    ssr_rec.close()
+            attempted = 0
+            block_size = first_block
+            reached = False
+            while not reached and attempted < max_attempts:
+                cnts, codes, cur_cnt, table_id = kernel(table_id, cur_cnt, block_size, rand)
+                attempted += block_size
+                block_size = min(block_size * 2, block_cap)
+                if single_target is not None:
+                    for cnt, code in zip(cnts.tolist(), codes.tolist()):
+                        i += cnt
+                        owed = remaining[code]
+                        if owed:
+                            remaining[code] = owed - 1
+                            rem_total -= 1
+                        if not rem_total:
+                            reached = True
+                            break
+                else:
+                    for cnt, code in zip(cnts.tolist(), codes.tolist()):
+                        i += cnt
+                        counts[code] += 1
+                        if is_reach_target(counts, targets_arr):
+                            reached = True
+                            break
 
             yield i
@@ -2,7 +2,7 @@ from collections import Counter
 from typing import List
 
 import numpy as np
-from scipy.optimize import minimize, OptimizeResult
+from scipy.optimize import minimize_scalar, OptimizeResult
 
 
 def counter_contain(
@@ -24,7 +24,8 @@ def counter_contain(
     bool
         True if the assumption is correct, otherwise False.
     """
-    return counter1 | counter2 == counter1
+    # key-wise check short-circuits and allocates no union counter
+    return all(counter1[key] >= cnt for key, cnt in counter2.items())
 
 
 def cal_individual_probs(
@@ -32,7 +33,7 @@ def cal_individual_probs(
         base_cnt: int,
         pity_cnt: int,
         prob_increase: float
-) -> List[float]:
+) -> np.ndarray:
     """
     Calculate the individual probabilities based on the given parameters.
 
@@ -49,18 +50,20 @@ def cal_individual_probs(
 
     Returns:
     --------
-    individual_probs : List[float]
-        A list containing the individual probabilities for each count.
+    individual_probs : np.ndarray
+        An array containing the individual probabilities for each count.
     """
-    return [
-        base_prob + max(0, i - base_cnt) * prob_increase
-        for i in range(1, pity_cnt)
-    ] + [1]
+    i = np.arange(1, pity_cnt)
+    # steep ramps can cross 1 before the pity row; clip so the values
+    # stay probabilities
+    probs = np.minimum(1.0, base_prob + np.maximum(0, i - base_cnt) * prob_increase)
+
+    return np.append(probs, 1.0)
 
 
 def cal_conditional_probs(
         prob_list: List[float]
-) -> List[float]:
+) -> np.ndarray:
     """
     Calculate the conditional probabilities based on the individual probabilities.
 
@@ -71,16 +74,14 @@ def cal_conditional_probs(
 
     Returns:
     --------
-    conditional_probs : List[float]
-        A list containing the conditional probabilities calculated based on the individual probabilities.
+    conditional_probs : np.ndarray
+        An array containing the conditional probabilities calculated based on the individual probabilities.
     """
-    conditional_probs = []
-    last_condi = 1
-    for prob in prob_list:
-        conditional_probs.append(last_condi * prob)
-        last_condi *= 1 - prob
+    probs = np.asarray(prob_list, dtype=np.float64)
+    # survival up to each attempt times the hit probability there
+    survival = np.concatenate(([1.0], np.cumprod(1 - probs[:-1])))
 
-    return conditional_probs
+    return survival * probs
 
 
 def cal_expectation(
@@ -99,11 +100,9 @@ def cal_expectation(
     expectation : float
         The calculated expectation based on the conditional probabilities.
     """
-    expectation = 0
-    for i, p in enumerate(prob_list):
-        expectation += (i + 1) * p
+    probs = np.asarray(prob_list, dtype=np.float64)
 
-    return expectation
+    return float(np.arange(1, len(probs) + 1) @ probs)
 
 
 def estimate_prob_increase(
@@ -130,27 +129,33 @@ def estimate_prob_increase(
     Returns:
     --------
     mini_result : OptimizeResult
-        An object containing the result of the minimization process.
+        An object containing the result of the minimization process;
+        its `x` attribute is the scalar estimate.
     """
 
+    # everything except the estimate itself is loop-invariant across the
+    # optimizer's evaluations, so hoist it out of the loss
+    ramp = np.append(np.maximum(0, np.arange(1, pity_cnt) - base_cnt), 0.0)
+    attempts = np.arange(1, pity_cnt + 1)
+
     def _prob_loss(
             est_increase
     ):
-        ind_probs = cal_individual_probs(
-            base_prob,
-            base_cnt,
-            pity_cnt,
-            est_increase[0]
-        )
-        condi_probs = cal_conditional_probs(ind_probs)
-        total_prob = 1 / cal_expectation(condi_probs)
+        ind_probs = np.minimum(1.0, ramp * est_increase + base_prob)
+        ind_probs[-1] = 1.0
+        # survival up to each attempt times the hit probability there
+        condi_probs = np.concatenate(([1.0], np.cumprod(1 - ind_probs[:-1]))) * ind_probs
+        total_prob = 1 / (attempts @ condi_probs)
 
         return ((total_prob - target_prob) * 1e6) ** 2
 
-    mini_result = minimize(
+    # the problem is 1-D with a known bracket, so a bounded scalar search
+    # needs far fewer loss evaluations than gradient-based minimize
+    mini_result = minimize_scalar(
         fun=_prob_loss,
-        x0=np.array([0.01]),
-        options={"xrtol": 1e-4}
+        bounds=(0.0, 1.0),
+        method='bounded',
+        options={"xatol": 1e-8}
     )
 
     return mini_result